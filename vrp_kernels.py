@@ -0,0 +1,88 @@
+"""Numeric kernels used by the VRP Scenario Builder UI.
+
+   Small scenes use the NumPy implementations below. From NUMBA_MIN_NODES
+   nodes on, the numba-compiled kernels in vrp_numba_kernels.py are used
+   instead if numba is installed; numba is only imported at that point.
+"""
+
+import numpy as np
+
+NUMBA_MIN_NODES = 500  # Below this NumPy is fast enough to not pay numba's import and compile time
+
+_numba_kernels = None  # vrp_numba_kernels module once imported, False if numba is not installed
+
+
+def _nearest_node_numpy(xs, ys, x, y, radius2):
+    """Returns the index of the node closest to (x, y) within radius2, or -1."""
+    if xs.shape[0] == 0:
+        return -1
+    if xs.shape[0] < 16:
+        # For a handful of nodes a plain loop is cheaper than the NumPy call overhead
+        best = -1
+        best_dist2 = float("inf")
+        for i, (node_x, node_y) in enumerate(zip(xs.tolist(), ys.tolist())):
+            dist2 = (node_x - x) ** 2 + (node_y - y) ** 2
+            if dist2 < best_dist2:
+                best = i
+                best_dist2 = dist2
+        return best if best_dist2 <= radius2 else -1
+    dx = xs - x
+    dy = ys - y
+    dist2 = dx * dx + dy * dy
+    best = int(dist2.argmin())
+    return best if dist2[best] <= radius2 else -1
+
+
+def _distance_block_numpy(row_xs, row_ys, xs, ys):
+    """Returns the distances (x100, rounded) from each (row_xs, row_ys) point to each (xs, ys) point."""
+    # Broadcast per axis and reuse the buffers in place to keep temporaries to two arrays
+    dx = np.subtract.outer(row_xs, xs)
+    dy = np.subtract.outer(row_ys, ys)
+    np.hypot(dx, dy, out=dx)
+    dx *= 100
+    np.rint(dx, out=dx)  # Round to the nearest solver unit rather than truncating
+    return dx.astype(np.int64)
+
+
+def _distance_matrix_numpy(xs, ys):
+    """Returns the symmetric distance matrix (x100, rounded) between all (xs, ys) points."""
+    # Gathering the upper triangle costs more in NumPy than computing the full broadcast
+    return _distance_block_numpy(xs, ys, xs, ys)
+
+
+def _compiled_kernels(n):
+    """Returns the numba kernel module for a scene of n nodes, or None to use NumPy."""
+    global _numba_kernels
+    if n < NUMBA_MIN_NODES:
+        return None
+    if _numba_kernels is None:
+        try:
+            import vrp_numba_kernels
+            _numba_kernels = vrp_numba_kernels
+        except ImportError:  # numba is optional
+            _numba_kernels = False
+    return _numba_kernels or None
+
+
+def nearest_node(xs, ys, x, y, radius2):
+    """Returns the index of the node closest to (x, y) within radius2, or -1."""
+    kernels = _compiled_kernels(xs.shape[0])
+    if kernels is None:
+        return _nearest_node_numpy(xs, ys, x, y, radius2)
+    return kernels.nearest_node(xs, ys, x, y, radius2)
+
+
+def distance_block(row_xs, row_ys, xs, ys):
+    """Returns the distances (x100, rounded) from each (row_xs, row_ys) point to each (xs, ys) point."""
+    kernels = _compiled_kernels(xs.shape[0])
+    if kernels is None:
+        return _distance_block_numpy(row_xs, row_ys, xs, ys)
+    return kernels.distance_block(row_xs, row_ys, xs, ys)
+
+
+def distance_matrix(xs, ys):
+    """Returns the symmetric distance matrix (x100, rounded) between all (xs, ys) points."""
+    kernels = _compiled_kernels(xs.shape[0])
+    if kernels is None:
+        return _distance_matrix_numpy(xs, ys)
+    return kernels.distance_matrix(xs, ys)
@@ -0,0 +1,56 @@
+"""numba-compiled versions of the kernels in vrp_kernels.py.
+
+   Importing this module requires numba and compiles all kernels, so
+   vrp_kernels only imports it once a scene is large enough to benefit.
+"""
+
+import math
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit("i8(f8[::1], f8[::1], f8, f8, f8)", cache=True, fastmath=True)
+def nearest_node(xs, ys, x, y, radius2):
+    """Returns the index of the node closest to (x, y) within radius2, or -1."""
+    n = xs.shape[0]
+    if n == 0:
+        return -1
+    best = 0
+    best_dist2 = (xs[0] - x) ** 2 + (ys[0] - y) ** 2
+    for i in range(1, n):
+        dx = xs[i] - x
+        dy = ys[i] - y
+        dist2 = dx * dx + dy * dy
+        if dist2 < best_dist2:
+            best = i
+            best_dist2 = dist2
+    return best if best_dist2 <= radius2 else -1
+
+
+# No fastmath here, so the results match the NumPy implementation exactly
+@njit("i8[:, ::1](f8[::1], f8[::1], f8[::1], f8[::1])", cache=True, parallel=True)
+def distance_block(row_xs, row_ys, xs, ys):
+    """Returns the distances (x100, rounded) from each (row_xs, row_ys) point to each (xs, ys) point."""
+    m = row_xs.shape[0]
+    n = xs.shape[0]
+    out = np.empty((m, n), dtype=np.int64)
+    for i in prange(m):
+        for j in range(n):
+            out[i, j] = np.int64(np.rint(math.hypot(row_xs[i] - xs[j], row_ys[i] - ys[j]) * 100))
+    return out
+
+
+@njit("i8[:, ::1](f8[::1], f8[::1])", cache=True, parallel=True)
+def distance_matrix(xs, ys):
+    """Returns the symmetric distance matrix (x100, rounded) between all (xs, ys) points."""
+    n = xs.shape[0]
+    out = np.empty((n, n), dtype=np.int64)
+    for i in prange(n):
+        out[i, i] = 0
+        # Compute the upper triangle only and mirror it into the lower one
+        for j in range(i + 1, n):
+            dist = np.int64(np.rint(math.hypot(xs[i] - xs[j], ys[i] - ys[j]) * 100))
+            out[i, j] = dist
+            out[j, i] = dist
+    return out
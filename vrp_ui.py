@@ -1,80 +1,344 @@
 import tkinter as tk
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
-import json
-import math
+import orjson
+import base64
+import hashlib
 import threading
 import queue
+import itertools
 from PIL import Image, ImageTk
 import numpy as np
-import copy
 import os
-
-# Import the VRP solver functionality from main.py
-from main import create_data_model as original_create_data_model
-from main import pywrapcp, routing_enums_pb2
+import sys
 
 
 class VRPNode:
-    """Class to represent a node in the VRP (customer or depot)"""
-    id_counter = 0
+    """Class to represent a node in the VRP (customer or depot)
+
+    A VRPNode is a lightweight view of one row of a NodeStore, which keeps the
+    data of all nodes in NumPy arrays. Create nodes with NodeStore.add_node.
+    """
+    __slots__ = ("_store", "_idx")
+    id_counter = 1  # ID 0 is reserved for the depot
+    _skill_bits = {}  # Dict of skill name -> bit in skill masks (shared by all nodes and vehicles)
     
-    def __init__(self, x, y, is_depot=False):
-        if not is_depot:
-            self.id = VRPNode.id_counter
-            VRPNode.id_counter += 1
-        else:
-            self.id = 0  # Depot is always ID 0
-            
-        self.x = x
-        self.y = y
-        self.is_depot = is_depot
-        self.time_window = None  # (start_time, end_time) or None if no time window
-        self.required_skills = set()  # Set of required skills
+    def __init__(self, store, idx):
+        self._store = store
+        self._idx = idx
+    
+    @property
+    def id(self):
+        return int(self._store.ids[self._idx])
+    
+    @property
+    def x(self):
+        return float(self._store.xs[self._idx])
+    
+    @property
+    def y(self):
+        return float(self._store.ys[self._idx])
+    
+    @property
+    def is_depot(self):
+        return bool(self._store.is_depot[self._idx])
+    
+    @property
+    def time_window(self):
+        """(start_time, end_time) or None if no time window"""
+        if not self._store.has_time_window[self._idx]:
+            return None
+        start_time, end_time = self._store.time_windows[self._idx].tolist()
+        return start_time, end_time
+    
+    @property
+    def skill_mask(self):
+        """Bitmask of required skills (see skill_bit)"""
+        return int(self._store.skill_masks[self._idx])
+    
+    @property
+    def _has_constraints(self):
+        """Cached: has a time window or required skills"""
+        return bool(self._store.has_constraints[self._idx])
+        
+    def _update_constraints_flag(self):
+        """Refresh the cached constraints flag after a constraint change"""
+        store, idx = self._store, self._idx
+        store.has_constraints[idx] = store.has_time_window[idx] or store.skill_masks[idx] != 0
+    
+    @classmethod
+    def skill_bit(cls, skill):
+        """Get the mask bit for a skill, assigning the lowest free bit the first time it is seen"""
+        bit = cls._skill_bits.get(skill)
+        if bit is None:
+            used = 0
+            for used_bit in cls._skill_bits.values():
+                used |= used_bit
+            bit = ~used & (used + 1)
+            if bit >= 1 << 63:  # Masks are stored as int64
+                raise ValueError("Too many skills: at most 63 skills can be defined.")
+            cls._skill_bits[sys.intern(skill)] = bit
+        return bit
+    
+    @staticmethod
+    def build_skill_bits(skills):
+        """Build a fresh skill -> bit registry for the given skill names (duplicates are ignored)"""
+        skill_bits = {}
+        for skill in skills:
+            if skill not in skill_bits:
+                if len(skill_bits) == 63:  # Masks are stored as int64
+                    raise ValueError("Too many skills: at most 63 skills can be defined.")
+                skill_bits[sys.intern(skill)] = 1 << len(skill_bits)
+        return skill_bits
+    
+    @classmethod
+    def reset_skill_bits(cls, skill_bits):
+        """Replace all skill bits with a registry from build_skill_bits (e.g. when loading a scenario)"""
+        cls._skill_bits.clear()
+        cls._skill_bits.update(skill_bits)
+    
+    @classmethod
+    def release_skill_bit(cls, skill):
+        """Free the mask bit of a skill that is no longer required by any node"""
+        cls._skill_bits.pop(skill, None)
+    
+    @classmethod
+    def skills_to_mask(cls, skills):
+        """Convert skill names to a bitmask (e.g. for vehicle/node compatibility checks)"""
+        mask = 0
+        for skill in skills:
+            mask |= cls.skill_bit(skill)
+        return mask
+    
+    @classmethod
+    def mask_to_skills(cls, mask):
+        """Convert a bitmask back to a list of skill names"""
+        return [skill for skill, bit in cls._skill_bits.items() if mask & bit]
+    
+    @property
+    def required_skills(self):
+        """List of required skills"""
+        return self.mask_to_skills(self.skill_mask)
         
     def set_time_window(self, start_time, end_time):
         """Set time window for this node"""
         try:
-            self.time_window = (int(start_time), int(end_time))
-        except ValueError:
+            time_window = np.array((int(start_time), int(end_time)), dtype=np.int64)
+        except (ValueError, OverflowError):  # Not an integer, or too large for the int64 array
             return False
+        store, idx = self._store, self._idx
+        store.time_windows[idx] = time_window
+        store.has_time_window[idx] = True
+        store.has_constraints[idx] = True
         return True
         
     def clear_time_window(self):
         """Clear time window for this node"""
-        self.time_window = None
+        self._store.has_time_window[self._idx] = False
+        self._update_constraints_flag()
         
     def add_required_skill(self, skill):
         """Add a required skill for this node"""
-        self.required_skills.add(skill)
+        self._store.skill_masks[self._idx] |= self.skill_bit(skill)
+        self._store.has_constraints[self._idx] = True
+        
+    def set_skill_mask(self, skill_mask):
+        """Replace all required skills of this node with the skills in a bitmask"""
+        self._store.skill_masks[self._idx] = skill_mask
+        self._update_constraints_flag()
         
     def remove_required_skill(self, skill):
         """Remove a required skill from this node"""
-        if skill in self.required_skills:
-            self.required_skills.remove(skill)
-            
-    def to_dict(self):
-        """Convert node to dictionary for JSON serialization"""
-        return {
-            "id": self.id,
-            "x": self.x,
-            "y": self.y,
-            "is_depot": self.is_depot,
-            "time_window": self.time_window,
-            "required_skills": list(self.required_skills)
-        }
+        if self.has_required_skill(skill):
+            self._store.skill_masks[self._idx] &= ~self.skill_bit(skill)
+            self._update_constraints_flag()
+    
+    def has_required_skill(self, skill):
+        """Check whether this node requires the given skill"""
+        bit = self._skill_bits.get(skill)
+        return bit is not None and self.skill_mask & bit != 0
+
+
+class NodeStore:
+    """Structure-of-arrays storage for all VRP nodes
+
+    Each node is one row across the NumPy arrays below, and VRPNode objects are
+    views of a row. The arrays are over-allocated, so only the first len(store)
+    rows are valid. Rows stay in insertion order, except that removing a node
+    moves the last row into the freed slot.
+    """
+    _ARRAYS = ("ids", "xs", "ys", "is_depot", "time_windows", "has_time_window", "skill_masks", "has_constraints")
+    _versions = itertools.count(1)  # Shared so versions are never reused across stores
+    
+    def __init__(self, capacity=16):
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.xs = np.zeros(capacity, dtype=np.float64)
+        self.ys = np.zeros(capacity, dtype=np.float64)
+        self.is_depot = np.zeros(capacity, dtype=bool)
+        self.time_windows = np.zeros((capacity, 2), dtype=np.int64)
+        self.has_time_window = np.zeros(capacity, dtype=bool)
+        self.skill_masks = np.zeros(capacity, dtype=np.int64)
+        self.has_constraints = np.zeros(capacity, dtype=bool)
+        self.version = next(self._versions)  # Changes whenever nodes are added or removed
+        self._size = 0
+        self._views = []  # VRPNode view of each row
+        self._id2idx = {}  # Dict of node id -> row
+    
+    def __len__(self):
+        return self._size
+    
+    def __iter__(self):
+        return iter(self._views)
+    
+    def __getitem__(self, idx):
+        return self._views[idx]
+    
+    def positions(self):
+        """Return the x and y coordinates of all nodes as (views of) float64 arrays"""
+        return self.xs[:self._size], self.ys[:self._size]
+    
+    def to_dicts(self):
+        """Return all nodes as dictionaries for JSON serialization, reading each array column once"""
+        n = self._size
+        columns = (
+            self.ids[:n].tolist(), self.xs[:n].tolist(), self.ys[:n].tolist(), self.is_depot[:n].tolist(),
+            self.time_windows[:n].tolist(), self.has_time_window[:n].tolist(), self.skill_masks[:n].tolist()
+        )
+        return [
+            {
+                "id": node_id,
+                "x": x,
+                "y": y,
+                "is_depot": is_depot,
+                "time_window": tuple(time_window) if has_time_window else None,
+                "required_skills": VRPNode.mask_to_skills(skill_mask) if skill_mask else []
+            }
+            for node_id, x, y, is_depot, time_window, has_time_window, skill_mask in zip(*columns)
+        ]
+    
+    def coordinates_signature(self):
+        """Return a digest of all node coordinates (in row order), e.g. to validate a saved distance matrix"""
+        xs, ys = self.positions()
+        return hashlib.blake2b(xs.tobytes() + ys.tobytes(), digest_size=16).hexdigest()
+    
+    def index_of(self, node_id, default=None):
+        """Return the row of the node with the given id, or default if there is no such node"""
+        return self._id2idx.get(node_id, default)
+    
+    def nodes_requiring(self, skill):
+        """Return the nodes that require the given skill"""
+        bit = VRPNode._skill_bits.get(skill)
+        if bit is None:
+            return []
+        rows = np.flatnonzero(self.skill_masks[:self._size] & bit)
+        return [self._views[i] for i in rows.tolist()]
     
     @classmethod
-    def from_dict(cls, data):
-        """Create node from dictionary (for JSON deserialization)"""
-        node = cls(data["x"], data["y"], data["is_depot"])
-        node.id = data["id"]
-        node.time_window = data["time_window"]
-        node.required_skills = set(data["required_skills"])
+    def from_dicts(cls, records):
+        """Build a store from node dictionaries (as produced by to_dicts)
+
+        Required skills are left out, since skill bits must only be assigned
+        on the UI thread; apply them with VRPNode.skills_to_mask afterwards.
+        """
+        n = len(records)
+        store = cls(capacity=max(n, 1))
+        store.ids[:n] = np.fromiter((record["id"] for record in records), dtype=np.int64, count=n)
+        store.xs[:n] = np.fromiter((record["x"] for record in records), dtype=np.float64, count=n)
+        store.ys[:n] = np.fromiter((record["y"] for record in records), dtype=np.float64, count=n)
+        store.is_depot[:n] = np.fromiter((record["is_depot"] for record in records), dtype=bool, count=n)
+        store._size = n
+        store._views = [VRPNode(store, idx) for idx in range(n)]
+        for idx, node_id in enumerate(store.ids[:n].tolist()):
+            store._id2idx.setdefault(node_id, idx)
+        
+        for node, record in zip(store._views, records):
+            if record["time_window"]:
+                node.set_time_window(*record["time_window"])
+        return store
+    
+    def _grow(self):
+        """Double the capacity of all arrays"""
+        capacity = 2 * len(self.xs)
+        for name in self._ARRAYS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+    
+    def _append_row(self, source, source_idx, node):
+        """Copy a row from another store to the end of this one and bind node to it"""
+        if self._size == len(self.xs):
+            self._grow()
+        idx = self._size
+        for name in self._ARRAYS:
+            getattr(self, name)[idx] = getattr(source, name)[source_idx]
+        node._store, node._idx = self, idx
+        self._views.append(node)
+        self._id2idx.setdefault(node.id, idx)
+        self._size += 1
+        self.version = next(self._versions)
+    
+    def add_node(self, x, y, is_depot=False, node_id=None):
+        """Append a new node and return its VRPNode view"""
+        if node_id is None:
+            if is_depot:
+                node_id = 0  # Depot is always ID 0
+            else:
+                node_id = VRPNode.id_counter
+                VRPNode.id_counter += 1
+        
+        if self._size == len(self.xs):
+            self._grow()
+        idx = self._size
+        self.ids[idx] = node_id
+        self.xs[idx] = x
+        self.ys[idx] = y
+        self.is_depot[idx] = is_depot
+        self.has_time_window[idx] = False
+        self.skill_masks[idx] = 0
+        self.has_constraints[idx] = False
+        
+        node = VRPNode(self, idx)
+        self._views.append(node)
+        self._id2idx.setdefault(node_id, idx)  # Keep the first node if ids clash
+        self._size += 1
+        self.version = next(self._versions)
         return node
+    
+    def remove(self, node):
+        """Remove a node by moving the last row into its slot
+
+        The removed view is moved to a store of its own, so it stays readable.
+        """
+        idx = node._idx
+        last = self._size - 1
+        node_id = node.id
+        
+        NodeStore(capacity=1)._append_row(self, idx, node)
+        if self._id2idx.get(node_id) == idx:
+            del self._id2idx[node_id]
+        
+        if idx != last:
+            moved = self._views[last]
+            for name in self._ARRAYS:
+                array = getattr(self, name)
+                array[idx] = array[last]
+            moved._idx = idx
+            self._views[idx] = moved
+            if self._id2idx.get(moved.id) == last:
+                self._id2idx[moved.id] = idx
+        
+        self._views.pop()
+        self._size -= 1
+        self.version = next(self._versions)
 
 
 class VRPApp(ctk.CTk):
+    # Colors cycled through when drawing routes
+    _ROUTE_COLORS = ("red", "green", "blue", "purple", "orange", "brown", "pink", "cyan", "magenta", "yellow")
+    _N_COLORS = len(_ROUTE_COLORS)
+    _PRESET_MATRIX_MAX_NODES = 200  # Larger distance matrices are recomputed instead of saved in presets
+    
     def __init__(self):
         super().__init__()
         
@@ -87,19 +351,44 @@ class VRPApp(ctk.CTk):
         ctk.set_default_color_theme("blue")  # "blue", "green", "dark-blue"
         
         # Initialize app data
-        self.nodes = []  # List of VRPNode objects
+        self.nodes = NodeStore()  # All VRPNode objects (iterable, indexable by row)
+        self.debug = False  # Print verbose solver diagnostics such as the distance matrix
         self.selected_node = None  # Currently selected node
         self.num_vehicles = 4  # Default number of vehicles
         self.available_skills = []  # List of defined skills
         self.vehicle_skills = {}  # Dict of vehicle_id -> list of skills
         self.routes = []  # List of routes (each route is a list of node indices)
+        self._route_item_ids = []  # Canvas line item ids drawn for each route
+        self._routes_dirty = False  # True when routes or nodes changed since the last draw_routes
+        self._distance_matrix = None  # Cached solver distance matrix
+        self._distance_matrix_version = None  # NodeStore version the cached matrix was computed for
+        self._distance_xs = None  # Node coordinates the cached matrix was computed from
+        self._distance_ys = None
+        self._node_items = {}  # Dict of node id -> (shape item id, label item id) on the canvas
+        self._restyle_pending = set()  # Ids of nodes waiting to be recolored when Tk is idle
         self.queue = queue.Queue()  # For safe thread communication
+        self._pending_vehicle_count_after = None  # Pending after() id for the vehicle count update
+        self._solver_mod = None  # main.py solver module, imported on first solve (OR-Tools is slow to import)
+        self._kernels_mod = None  # vrp_kernels module, imported on first use
+        
+        # Rendered skill widgets, kept so the skills UI can be updated incrementally
+        self._skill_widgets = {}  # Dict of skill -> row frame in the skills list
+        self._vehicle_rows = {}  # Dict of vehicle_id -> (row label, skills frame)
+        self._vehicle_skill_checks = {}  # Dict of (vehicle_id, skill) -> (checkbox, BooleanVar)
+        self._node_skill_checks = {}  # Dict of skill -> (checkbox, BooleanVar) for the selected node
+        self._vehicle_skills_header = None
+        self._skills_placeholder = None
+        self._vehicle_skills_placeholder = None
+        self._node_skills_placeholder = None
         
         # Initialize the canvas scale factor (canvas coordinates to VRP coordinates)
         self.canvas_width = 800
         self.canvas_height = 600
         self.scale_factor = 10  # 1 VRP coordinate unit = 10 pixels
         
+        # Section title font, shared by all sections
+        self._h2_font = ctk.CTkFont(size=14, weight="bold")
+        
         # Create UI elements
         self.create_widgets()
         
@@ -107,12 +396,16 @@ class VRPApp(ctk.CTk):
         canvas_center_x = self.canvas_width // 2
         canvas_center_y = self.canvas_height // 2
         vrp_x, vrp_y = self.canvas_to_vrp_coords(canvas_center_x, canvas_center_y)
-        self.depot_node = VRPNode(vrp_x, vrp_y, is_depot=True)
-        self.nodes.append(self.depot_node)
+        self.depot_node = self.nodes.add_node(vrp_x, vrp_y, is_depot=True)
         
         # Draw depot node
         self.draw_nodes()
         
+        # Hand messages from worker threads to the UI thread as soon as they are posted
+        dispatcher_thread = threading.Thread(target=self._dispatch_messages)
+        dispatcher_thread.daemon = True
+        dispatcher_thread.start()
+        
     def create_widgets(self):
         """Create all UI widgets"""
         # Create main frame layout
@@ -164,7 +457,7 @@ class VRPApp(ctk.CTk):
         vehicle_frame.grid(row=0, column=0, sticky="ew", padx=10, pady=10)
         
         # Title
-        vehicle_title = ctk.CTkLabel(vehicle_frame, text="Vehicle Configuration", font=ctk.CTkFont(size=14, weight="bold"))
+        vehicle_title = ctk.CTkLabel(vehicle_frame, text="Vehicle Configuration", font=self._h2_font)
         vehicle_title.grid(row=0, column=0, sticky="w", padx=10, pady=5, columnspan=2)
         
         # Vehicle count
@@ -195,7 +488,7 @@ class VRPApp(ctk.CTk):
         node_frame.grid(row=1, column=0, sticky="ew", padx=10, pady=10)
         
         # Title
-        node_title = ctk.CTkLabel(node_frame, text="Node Constraints", font=ctk.CTkFont(size=14, weight="bold"))
+        node_title = ctk.CTkLabel(node_frame, text="Node Constraints", font=self._h2_font)
         node_title.grid(row=0, column=0, sticky="w", padx=10, pady=5, columnspan=2)
         
         # Selected node info
@@ -247,7 +540,7 @@ class VRPApp(ctk.CTk):
         skills_frame.grid(row=2, column=0, sticky="ew", padx=10, pady=10)
         
         # Title
-        skills_title = ctk.CTkLabel(skills_frame, text="Skills Configuration", font=ctk.CTkFont(size=14, weight="bold"))
+        skills_title = ctk.CTkLabel(skills_frame, text="Skills Configuration", font=self._h2_font)
         skills_title.grid(row=0, column=0, sticky="w", padx=10, pady=5, columnspan=2)
         
         # Add skill
@@ -284,7 +577,7 @@ class VRPApp(ctk.CTk):
         actions_frame.grid(row=3, column=0, sticky="ew", padx=10, pady=10)
         
         # Title
-        actions_title = ctk.CTkLabel(actions_frame, text="Actions", font=ctk.CTkFont(size=14, weight="bold"))
+        actions_title = ctk.CTkLabel(actions_frame, text="Actions", font=self._h2_font)
         actions_title.grid(row=0, column=0, sticky="w", padx=10, pady=5)
         
         # Buttons
@@ -332,89 +625,215 @@ class VRPApp(ctk.CTk):
         canvas_y = self.canvas_height // 2 - (vrp_y * self.scale_factor)  # Y-axis is inverted in canvas
         return canvas_x, canvas_y
     
+    def vrp_to_canvas_coords_array(self, xs, ys):
+        """Convert arrays of VRP coordinates to canvas coordinates in one vectorized pass"""
+        canvas_xs = xs * self.scale_factor + self.canvas_width // 2
+        canvas_ys = self.canvas_height // 2 - ys * self.scale_factor  # Y-axis is inverted in canvas
+        return canvas_xs, canvas_ys
+    
+    def load_kernels_module(self):
+        """Import the numeric kernels (vrp_kernels.py) once and return the module"""
+        if self._kernels_mod is None:
+            import vrp_kernels as kernels_module
+            self._kernels_mod = kernels_module
+        return self._kernels_mod
+    
+    def compute_distance_matrix(self):
+        """Return the Euclidean distance matrix between all nodes, scaled by 100 to integer solver units"""
+        if self._distance_matrix_version == self.nodes.version:
+            return self._distance_matrix
+        
+        xs, ys = self.nodes.positions()
+        n = len(xs)
+        cached = self._distance_matrix
+        if cached is not None:
+            # Only rows whose coordinates changed and newly appended rows need recomputing
+            m = min(n, len(cached))
+            stale = np.flatnonzero((self._distance_xs[:m] != xs[:m]) | (self._distance_ys[:m] != ys[:m]))
+            stale = np.concatenate((stale, np.arange(m, n)))
+        
+        if cached is None or 2 * len(stale) > n:
+            matrix = self.load_kernels_module().distance_matrix(xs, ys)
+        else:
+            matrix = np.empty((n, n), dtype=np.int64)
+            matrix[:m, :m] = cached[:m, :m]
+            if len(stale):
+                rows = self.load_kernels_module().distance_block(xs[stale], ys[stale], xs, ys)
+                matrix[stale, :] = rows
+                matrix[:, stale] = rows.T  # Distances are symmetric
+        
+        self._distance_matrix = matrix
+        self._distance_matrix_version = self.nodes.version
+        self._distance_xs = xs.copy()
+        self._distance_ys = ys.copy()
+        return matrix
+    
+    def compact_distance_matrix(self):
+        """Return the distance matrix as a contiguous int32 array (int64 only if distances overflow int32)"""
+        distance_matrix = self.compute_distance_matrix()
+        dtype = np.int32
+        if distance_matrix.size and distance_matrix.max() > np.iinfo(np.int32).max:
+            dtype = np.int64  # Coordinates too far apart for 32-bit distances
+        return np.ascontiguousarray(distance_matrix, dtype=dtype)
+    
+    def find_node_at(self, canvas_x, canvas_y):
+        """Return the node closest to the given canvas position, or None if none is within reach"""
+        # Hit test in VRP coordinates against all nodes at once
+        vrp_x, vrp_y = self.canvas_to_vrp_coords(canvas_x, canvas_y)
+        radius2 = (10 / self.scale_factor) ** 2  # Node selection radius is 10 pixels
+        xs, ys = self.nodes.positions()
+        i = self.load_kernels_module().nearest_node(xs, ys, vrp_x, vrp_y, radius2)
+        return self.nodes[i] if i >= 0 else None
+    
     def draw_nodes(self):
         """Draw all nodes on the canvas"""
         # Clear existing nodes
         self.canvas.delete("node")
+        self._node_items = {}
+        
+        # Convert all node positions to canvas coordinates in one pass
+        canvas_xs, canvas_ys = self.vrp_to_canvas_coords_array(*self.nodes.positions())
         
         # Draw each node
-        for node in self.nodes:
-            canvas_x, canvas_y = self.vrp_to_canvas_coords(node.x, node.y)
-            
-            # Different style for depot vs customer nodes
-            if node.is_depot:
-                # Depot: Larger red square
-                size = 8
-                self.canvas.create_rectangle(
-                    canvas_x - size, canvas_y - size, 
-                    canvas_x + size, canvas_y + size,
-                    fill="red", outline="darkred", width=2,
-                    tags=("node", f"node_{node.id}", "depot")
-                )
-            else:
-                # Customer: Blue circle
-                size = 6
-                fill_color = "blue"
-                outline_color = "darkblue"
-                
-                # Change appearance if node has constraints
-                if node.time_window or node.required_skills:
-                    fill_color = "purple"
-                    outline_color = "purple"
-                    
-                # Highlight selected node
-                if self.selected_node and self.selected_node.id == node.id:
-                    fill_color = "orange"
-                    outline_color = "orange"
-                
-                self.canvas.create_oval(
-                    canvas_x - size, canvas_y - size, 
-                    canvas_x + size, canvas_y + size,
-                    fill=fill_color, outline=outline_color, width=2,
-                    tags=("node", f"node_{node.id}", "customer")
-                )
-            
-            # Add node ID label
-            self.canvas.create_text(
-                canvas_x, canvas_y + size + 10,
-                text=str(node.id),
-                fill="black",
-                tags=("node", f"node_label_{node.id}")
-            )
+        for node, canvas_x, canvas_y in zip(self.nodes, canvas_xs.tolist(), canvas_ys.tolist()):
+            self.add_node_items(node, canvas_x, canvas_y)
         
-        # Make sure routes stay visible if they exist
+        # Make sure routes stay visible on top of the redrawn nodes
         if self.routes:
             self.draw_routes()
+            self.canvas.tag_raise("route")
+    
+    def get_node_colors(self, node):
+        """Return the (fill, outline) colors for a customer node based on its state"""
+        # Highlight selected node
+        if self.selected_node and self.selected_node.id == node.id:
+            return "orange", "orange"
+        
+        # Change appearance if node has constraints
+        if node._has_constraints:
+            return "purple", "purple"
+        
+        return "blue", "darkblue"
+    
+    def add_node_items(self, node, canvas_x=None, canvas_y=None):
+        """Create the canvas items for a single node"""
+        if canvas_x is None or canvas_y is None:
+            canvas_x, canvas_y = self.vrp_to_canvas_coords(node.x, node.y)
+        
+        # Different style for depot vs customer nodes
+        if node.is_depot:
+            # Depot: Larger red square
+            size = 8
+            shape_id = self.canvas.create_rectangle(
+                canvas_x - size, canvas_y - size, 
+                canvas_x + size, canvas_y + size,
+                fill="red", outline="darkred", width=2,
+                tags=("node", f"node_{node.id}", "depot")
+            )
+        else:
+            # Customer: Blue circle
+            size = 6
+            fill_color, outline_color = self.get_node_colors(node)
+            shape_id = self.canvas.create_oval(
+                canvas_x - size, canvas_y - size, 
+                canvas_x + size, canvas_y + size,
+                fill=fill_color, outline=outline_color, width=2,
+                tags=("node", f"node_{node.id}", "customer")
+            )
+        
+        # Add node ID label
+        label_id = self.canvas.create_text(
+            canvas_x, canvas_y + size + 10,
+            text=str(node.id),
+            fill="black",
+            tags=("node", f"node_label_{node.id}")
+        )
+        
+        self._node_items[node.id] = (shape_id, label_id)
+    
+    def update_node_style(self, node):
+        """Recolor the canvas items of a single node to match its current state"""
+        if node is None or node.is_depot:
+            return  # Depot appearance never changes
+        
+        items = self._node_items.get(node.id)
+        if items is None:
+            return
+        
+        fill_color, outline_color = self.get_node_colors(node)
+        self.canvas.itemconfigure(items[0], fill=fill_color, outline=outline_color)
+    
+    def schedule_node_restyle(self, node):
+        """Recolor a node once Tk is idle, so several changes in one event collapse into one update"""
+        if node is None:
+            return
+        if not self._restyle_pending:
+            self.after_idle(self._flush_node_restyles)
+        self._restyle_pending.add(node.id)
+    
+    def _flush_node_restyles(self):
+        """Recolor all nodes scheduled by schedule_node_restyle that still exist"""
+        pending, self._restyle_pending = self._restyle_pending, set()
+        for node_id in pending:
+            idx = self.nodes.index_of(node_id)
+            if idx is not None:
+                self.update_node_style(self.nodes[idx])
+    
+    def remove_node_items(self, node):
+        """Delete the canvas items of a single node"""
+        items = self._node_items.pop(node.id, None)
+        if items is not None:
+            self.canvas.delete(*items)
+    
+    def set_routes(self, routes):
+        """Replace the current routes and redraw them"""
+        self.routes = routes
+        self._routes_dirty = True
+        self.draw_routes()
     
     def draw_routes(self):
-        """Draw the solution routes on the canvas"""
+        """Draw the solution routes on the canvas (no-op if they are already drawn and unchanged)"""
+        if not self._routes_dirty and self._route_item_ids:
+            return
+        self._routes_dirty = False
+        
         # Clear existing routes
         self.canvas.delete("route")
+        self._route_item_ids = []
         
-        # Colors for different routes
-        route_colors = ["red", "green", "blue", "purple", "orange", "brown", "pink", "cyan", "magenta", "yellow"]
+        # Convert all node positions to canvas coordinates in one pass
+        canvas_xs, canvas_ys = self.vrp_to_canvas_coords_array(*self.nodes.positions())
+        index_of = self.nodes.index_of
         
         # Draw each route
         for i, route in enumerate(self.routes):
             if not route:
                 continue
                 
-            color = route_colors[i % len(route_colors)]
+            color = self._ROUTE_COLORS[i % self._N_COLORS]
+            route_item_ids = []
+            self._route_item_ids.append(route_item_ids)
             
-            # Draw lines connecting nodes in the route
-            for j in range(len(route) - 1):
-                from_node = next((n for n in self.nodes if n.id == route[j]), None)
-                to_node = next((n for n in self.nodes if n.id == route[j + 1]), None)
-                
-                if from_node and to_node:
-                    from_x, from_y = self.vrp_to_canvas_coords(from_node.x, from_node.y)
-                    to_x, to_y = self.vrp_to_canvas_coords(to_node.x, to_node.y)
-                    
-                    self.canvas.create_line(
-                        from_x, from_y, to_x, to_y,
+            # Gather the canvas coordinates of the route's nodes (row -1 marks removed nodes)
+            rows = np.fromiter((index_of(node_id, -1) for node_id in route), dtype=np.int64, count=len(route))
+            exists = (rows >= 0).tolist()
+            route_xs = canvas_xs[rows].tolist()
+            route_ys = canvas_ys[rows].tolist()
+            
+            # Draw each run of existing nodes as one polyline (the trailing False ends the last run)
+            coords = []
+            for node_exists, x, y in zip(exists + [False], route_xs + [0], route_ys + [0]):
+                if node_exists:
+                    coords += (x, y)
+                    continue
+                if len(coords) >= 4:
+                    line_id = self.canvas.create_line(
+                        *coords,
                         fill=color, width=2,
                         tags=("route", f"route_{i}")
                     )
+                    route_item_ids.append(line_id)
+                coords = []
     
     def on_canvas_click(self, event):
         """Handle left click on canvas"""
@@ -423,13 +842,7 @@ class VRPApp(ctk.CTk):
         canvas_y = event.y
         
         # Check if clicked on existing node
-        clicked_node = None
-        for node in self.nodes:
-            node_x, node_y = self.vrp_to_canvas_coords(node.x, node.y)
-            distance = math.sqrt((node_x - canvas_x)**2 + (node_y - canvas_y)**2)
-            if distance <= 10:  # Node selection radius
-                clicked_node = node
-                break
+        clicked_node = self.find_node_at(canvas_x, canvas_y)
         
         if clicked_node:
             # Select existing node
@@ -437,10 +850,9 @@ class VRPApp(ctk.CTk):
         else:
             # Add new node at click position
             vrp_x, vrp_y = self.canvas_to_vrp_coords(canvas_x, canvas_y)
-            new_node = VRPNode(vrp_x, vrp_y)
-            self.nodes.append(new_node)
+            new_node = self.nodes.add_node(vrp_x, vrp_y)
+            self.add_node_items(new_node)
             self.select_node(new_node)
-            self.draw_nodes()
             self.status_label.configure(text=f"Added node {new_node.id} at ({vrp_x:.1f}, {vrp_y:.1f})")
     
     def on_canvas_right_click(self, event):
@@ -450,13 +862,7 @@ class VRPApp(ctk.CTk):
         canvas_y = event.y
         
         # Check if clicked on existing node
-        clicked_node = None
-        for node in self.nodes:
-            node_x, node_y = self.vrp_to_canvas_coords(node.x, node.y)
-            distance = math.sqrt((node_x - canvas_x)**2 + (node_y - canvas_y)**2)
-            if distance <= 10:  # Node selection radius
-                clicked_node = node
-                break
+        clicked_node = self.find_node_at(canvas_x, canvas_y)
                 
         if clicked_node:
             # Don't allow removing depot
@@ -466,13 +872,16 @@ class VRPApp(ctk.CTk):
                 
             # Remove the node
             self.nodes.remove(clicked_node)
+            self.remove_node_items(clicked_node)
             if self.selected_node and self.selected_node.id == clicked_node.id:
                 self.select_node(None)  # Deselect if removing selected node
-            self.draw_nodes()
+            if self.routes:
+                self.set_routes(self.routes)  # Drop route segments through the removed node
             self.status_label.configure(text=f"Removed node {clicked_node.id}")
     
     def select_node(self, node):
         """Select a node and update UI"""
+        previous_node = self.selected_node
         self.selected_node = node
         
         if node is None:
@@ -500,8 +909,10 @@ class VRPApp(ctk.CTk):
             # Update node skills UI
             self.update_node_skills_ui()
         
-        # Redraw to highlight selected node
-        self.draw_nodes()
+        # Recolor only the previously and newly selected nodes
+        if previous_node is not node:
+            self.update_node_style(previous_node)
+            self.update_node_style(node)
     
     def toggle_node_constraint_controls(self, enabled):
         """Enable or disable node constraint controls"""
@@ -511,31 +922,46 @@ class VRPApp(ctk.CTk):
         self.set_time_window_btn.configure(state=state)
         self.clear_time_window_btn.configure(state=state)
     
+    def toggle_skills_placeholder(self, placeholder, parent, show):
+        """Show or hide a "No skills defined" label in parent and return the current label (or None)"""
+        if show and placeholder is None:
+            placeholder = ctk.CTkLabel(parent, text="No skills defined")
+            placeholder.grid(row=0, column=0, sticky="w", padx=5, pady=5)
+        elif not show and placeholder is not None:
+            placeholder.destroy()
+            placeholder = None
+        return placeholder
+    
     def update_skills_ui(self):
-        """Update the skills list UI"""
-        # Clear existing skills UI
-        for widget in self.skills_list_frame.winfo_children():
-            widget.destroy()
+        """Update the skills list UI (only widgets of added or deleted skills are created/destroyed)"""
+        current_skills = set(self.available_skills)
+        
+        # Remove rows of deleted skills
+        for skill in [s for s in self._skill_widgets if s not in current_skills]:
+            self._skill_widgets.pop(skill).destroy()
             
         # No skills message
-        if not self.available_skills:
-            no_skills_label = ctk.CTkLabel(self.skills_list_frame, text="No skills defined")
-            no_skills_label.grid(row=0, column=0, sticky="w", padx=5, pady=5)
-            return
+        self._skills_placeholder = self.toggle_skills_placeholder(
+            self._skills_placeholder, self.skills_list_frame, not self.available_skills
+        )
             
-        # Add each skill with a delete button
+        # Add a row with a delete button for each new skill, keeping rows in list order
         for i, skill in enumerate(self.available_skills):
-            skill_frame = ctk.CTkFrame(self.skills_list_frame)
-            skill_frame.grid(row=i, column=0, sticky="ew", padx=5, pady=2)
-            
-            skill_label = ctk.CTkLabel(skill_frame, text=skill)
-            skill_label.grid(row=0, column=0, sticky="w", padx=5, pady=5)
+            skill_frame = self._skill_widgets.get(skill)
+            if skill_frame is None:
+                skill_frame = ctk.CTkFrame(self.skills_list_frame)
+                
+                skill_label = ctk.CTkLabel(skill_frame, text=skill)
+                skill_label.grid(row=0, column=0, sticky="w", padx=5, pady=5)
+                
+                delete_btn = ctk.CTkButton(
+                    skill_frame, text="X", width=30, 
+                    command=lambda s=skill: self.on_delete_skill(s)
+                )
+                delete_btn.grid(row=0, column=1, sticky="e", padx=5, pady=5)
+                self._skill_widgets[skill] = skill_frame
             
-            delete_btn = ctk.CTkButton(
-                skill_frame, text="X", width=30, 
-                command=lambda s=skill: self.on_delete_skill(s)
-            )
-            delete_btn.grid(row=0, column=1, sticky="e", padx=5, pady=5)
+            skill_frame.grid(row=i, column=0, sticky="ew", padx=5, pady=2)
         
         # Update other UI elements that depend on skills
         self.update_vehicle_skills_ui()
@@ -544,68 +970,113 @@ class VRPApp(ctk.CTk):
     
     def update_vehicle_skills_ui(self):
         """Update the vehicle skills UI based on number of vehicles and available skills"""
-        # Clear existing vehicle skills UI
-        for widget in self.vehicle_skills_frame.winfo_children():
-            widget.destroy()
-            
         # Initialize vehicle skills if needed
         for i in range(self.num_vehicles):
             if i not in self.vehicle_skills:
                 self.vehicle_skills[i] = []
         
-        # No skills message
-        if not self.available_skills:
-            no_skills_label = ctk.CTkLabel(self.vehicle_skills_frame, text="No skills defined")
-            no_skills_label.grid(row=0, column=0, sticky="w", padx=5, pady=5)
-            return
+        # Vehicle rows are only shown while there are skills to assign
+        row_count = self.num_vehicles if self.available_skills else 0
+        current_skills = set(self.available_skills)
         
-        # Create a title row
-        vehicle_label = ctk.CTkLabel(self.vehicle_skills_frame, text="Vehicle")
-        vehicle_label.grid(row=0, column=0, sticky="w", padx=5, pady=5)
+        # Remove checkboxes of deleted skills (checkboxes of removed vehicles go with their row frame)
+        for key in list(self._vehicle_skill_checks):
+            vehicle_id, skill = key
+            if vehicle_id >= row_count:
+                del self._vehicle_skill_checks[key]
+            elif skill not in current_skills:
+                checkbox, _ = self._vehicle_skill_checks.pop(key)
+                checkbox.destroy()
         
-        skills_label = ctk.CTkLabel(self.vehicle_skills_frame, text="Skills")
-        skills_label.grid(row=0, column=1, sticky="w", padx=5, pady=5)
+        # Remove rows of vehicles beyond the current count
+        for vehicle_id in [v for v in self._vehicle_rows if v >= row_count]:
+            for widget in self._vehicle_rows.pop(vehicle_id):
+                widget.destroy()
         
-        # Create a row for each vehicle
-        for i in range(self.num_vehicles):
-            vehicle_row_label = ctk.CTkLabel(self.vehicle_skills_frame, text=f"Vehicle {i}")
-            vehicle_row_label.grid(row=i+1, column=0, sticky="w", padx=5, pady=5)
+        # No skills message
+        self._vehicle_skills_placeholder = self.toggle_skills_placeholder(
+            self._vehicle_skills_placeholder, self.vehicle_skills_frame, not self.available_skills
+        )
+        
+        # Create a title row
+        if self.available_skills and self._vehicle_skills_header is None:
+            vehicle_label = ctk.CTkLabel(self.vehicle_skills_frame, text="Vehicle")
+            vehicle_label.grid(row=0, column=0, sticky="w", padx=5, pady=5)
             
-            # Create a frame for the skills checkboxes
-            skills_frame = ctk.CTkFrame(self.vehicle_skills_frame)
-            skills_frame.grid(row=i+1, column=1, sticky="w", padx=5, pady=2)
+            skills_label = ctk.CTkLabel(self.vehicle_skills_frame, text="Skills")
+            skills_label.grid(row=0, column=1, sticky="w", padx=5, pady=5)
+            self._vehicle_skills_header = (vehicle_label, skills_label)
+        elif not self.available_skills and self._vehicle_skills_header is not None:
+            for widget in self._vehicle_skills_header:
+                widget.destroy()
+            self._vehicle_skills_header = None
+        
+        # Create missing rows and checkboxes for each vehicle
+        for i in range(row_count):
+            row = self._vehicle_rows.get(i)
+            if row is None:
+                vehicle_row_label = ctk.CTkLabel(self.vehicle_skills_frame, text=f"Vehicle {i}")
+                vehicle_row_label.grid(row=i+1, column=0, sticky="w", padx=5, pady=5)
+                
+                # Create a frame for the skills checkboxes
+                skills_frame = ctk.CTkFrame(self.vehicle_skills_frame)
+                skills_frame.grid(row=i+1, column=1, sticky="w", padx=5, pady=2)
+                row = self._vehicle_rows[i] = (vehicle_row_label, skills_frame)
+            skills_frame = row[1]
             
             # Add checkboxes for each skill
+            vehicle_skills = self.vehicle_skills.get(i, [])
             for j, skill in enumerate(self.available_skills):
-                skill_var = tk.BooleanVar(value=skill in self.vehicle_skills.get(i, []))
-                skill_checkbox = ctk.CTkCheckBox(
-                    skills_frame, text=skill, variable=skill_var,
-                    command=lambda v=i, s=skill, var=skill_var: self.on_vehicle_skill_toggle(v, s, var)
-                )
+                has_skill = skill in vehicle_skills
+                check = self._vehicle_skill_checks.get((i, skill))
+                if check is None:
+                    skill_var = tk.BooleanVar(value=has_skill)
+                    skill_checkbox = ctk.CTkCheckBox(
+                        skills_frame, text=skill, variable=skill_var,
+                        command=lambda v=i, s=skill, var=skill_var: self.on_vehicle_skill_toggle(v, s, var)
+                    )
+                    self._vehicle_skill_checks[(i, skill)] = (skill_checkbox, skill_var)
+                else:
+                    # Sync existing checkbox in case vehicle skills were replaced (e.g. preset load)
+                    skill_checkbox, skill_var = check
+                    if skill_var.get() != has_skill:
+                        skill_var.set(has_skill)
                 skill_checkbox.grid(row=0, column=j, sticky="w", padx=5, pady=2)
     
     def update_node_skills_ui(self):
         """Update the node skills UI for the selected node"""
-        # Clear existing node skills UI
-        for widget in self.node_skills_frame.winfo_children():
-            widget.destroy()
-            
-        if not self.selected_node:
-            return
+        current_skills = set(self.available_skills) if self.selected_node else set()
+        
+        # Remove checkboxes of deleted skills (or all of them if no node is selected)
+        for skill in [s for s in self._node_skill_checks if s not in current_skills]:
+            checkbox, _ = self._node_skill_checks.pop(skill)
+            checkbox.destroy()
             
         # No skills message
-        if not self.available_skills:
-            no_skills_label = ctk.CTkLabel(self.node_skills_frame, text="No skills defined")
-            no_skills_label.grid(row=0, column=0, sticky="w", padx=5, pady=5)
+        self._node_skills_placeholder = self.toggle_skills_placeholder(
+            self._node_skills_placeholder, self.node_skills_frame,
+            self.selected_node is not None and not self.available_skills
+        )
+        
+        if not self.selected_node:
             return
             
         # Add checkboxes for each skill
         for i, skill in enumerate(self.available_skills):
-            skill_var = tk.BooleanVar(value=skill in self.selected_node.required_skills)
-            skill_checkbox = ctk.CTkCheckBox(
-                self.node_skills_frame, text=skill, variable=skill_var,
-                command=lambda s=skill, var=skill_var: self.on_node_skill_toggle(s, var)
-            )
+            required = self.selected_node.has_required_skill(skill)
+            check = self._node_skill_checks.get(skill)
+            if check is None:
+                skill_var = tk.BooleanVar(value=required)
+                skill_checkbox = ctk.CTkCheckBox(
+                    self.node_skills_frame, text=skill, variable=skill_var,
+                    command=lambda s=skill, var=skill_var: self.on_node_skill_toggle(s, var)
+                )
+                self._node_skill_checks[skill] = (skill_checkbox, skill_var)
+            else:
+                # Sync existing checkbox with the selected node
+                skill_checkbox, skill_var = check
+                if skill_var.get() != required:
+                    skill_var.set(required)
             skill_checkbox.grid(row=i // 2, column=i % 2, sticky="w", padx=5, pady=2)
     
     def on_vehicle_count_change(self, value):
@@ -614,7 +1085,15 @@ class VRPApp(ctk.CTk):
         self.num_vehicles = new_count
         self.vehicle_count_label.configure(text=str(new_count))
         
-        # Update vehicle skills
+        # The slider fires on every tick while dragging, so only update
+        # the vehicle skills UI once the value has settled
+        if self._pending_vehicle_count_after is not None:
+            self.after_cancel(self._pending_vehicle_count_after)
+        self._pending_vehicle_count_after = self.after(120, self._apply_vehicle_count)
+    
+    def _apply_vehicle_count(self):
+        """Update the vehicle skills UI after the vehicle count slider has settled"""
+        self._pending_vehicle_count_after = None
         self.update_vehicle_skills_ui()
     
     def on_set_time_window(self):
@@ -646,8 +1125,10 @@ class VRPApp(ctk.CTk):
             return
         
         # Set the time window
-        self.selected_node.set_time_window(start_time, end_time)
-        self.draw_nodes()  # Redraw to update node appearance
+        if not self.selected_node.set_time_window(start_time, end_time):
+            messagebox.showwarning("Invalid Time Window", "Times are too large.")
+            return
+        self.schedule_node_restyle(self.selected_node)  # Recolor to update node appearance
         self.status_label.configure(text=f"Set time window [{start_time}, {end_time}] for node {self.selected_node.id}")
     
     def on_clear_time_window(self):
@@ -658,12 +1139,12 @@ class VRPApp(ctk.CTk):
         self.selected_node.clear_time_window()
         self.time_window_start.delete(0, tk.END)
         self.time_window_end.delete(0, tk.END)
-        self.draw_nodes()  # Redraw to update node appearance
+        self.schedule_node_restyle(self.selected_node)  # Recolor to update node appearance
         self.status_label.configure(text=f"Cleared time window for node {self.selected_node.id}")
     
     def on_add_skill(self):
         """Handle add skill button click"""
-        new_skill = self.new_skill_entry.get().strip()
+        new_skill = sys.intern(self.new_skill_entry.get().strip())
         
         if not new_skill:
             messagebox.showwarning("Invalid Skill", "Please enter a skill name.")
@@ -672,6 +1153,13 @@ class VRPApp(ctk.CTk):
         if new_skill in self.available_skills:
             messagebox.showwarning("Duplicate Skill", f"Skill '{new_skill}' already exists.")
             return
+        
+        # Reserve a bit for the skill in node skill masks
+        try:
+            VRPNode.skill_bit(new_skill)
+        except ValueError as e:
+            messagebox.showwarning("Too Many Skills", str(e))
+            return
             
         # Add the skill
         self.available_skills.append(new_skill)
@@ -691,14 +1179,14 @@ class VRPApp(ctk.CTk):
                 if skill in skills:
                     skills.remove(skill)
             
-            # Remove skill from all nodes
-            for node in self.nodes:
-                if skill in node.required_skills:
-                    node.required_skills.remove(skill)
+            # Remove skill from all nodes, then free its mask bit
+            for node in self.nodes.nodes_requiring(skill):
+                node.remove_required_skill(skill)
+                self.schedule_node_restyle(node)  # Might change appearance if it lost its only skill
+            VRPNode.release_skill_bit(skill)
             
             # Update UI
             self.update_skills_ui()
-            self.draw_nodes()  # Redraw nodes (some might change appearance if they lost their only skill)
             self.status_label.configure(text=f"Deleted skill: {skill}")
     
     def on_vehicle_skill_toggle(self, vehicle_id, skill, var):
@@ -726,8 +1214,8 @@ class VRPApp(ctk.CTk):
             # Remove skill requirement from node
             self.selected_node.remove_required_skill(skill)
             
-        # Redraw nodes to update appearance
-        self.draw_nodes()
+        # Recolor node to update appearance
+        self.schedule_node_restyle(self.selected_node)
         
         # Update status
         action = "added to" if var.get() else "removed from"
@@ -745,23 +1233,42 @@ class VRPApp(ctk.CTk):
         if not file_path:
             return  # User cancelled
             
+        # Prepare data to save (copied, since the file is written on a worker thread)
+        data = {
+            "nodes": self.nodes.to_dicts(),
+            "num_vehicles": self.num_vehicles,
+            "available_skills": list(self.available_skills),
+            "vehicle_skills": {v_id: list(skills) for v_id, skills in self.vehicle_skills.items()}
+        }
+        
+        # Include the distance matrix only if it is already cached and small; otherwise it is
+        # cheaper to recompute after loading than to write and parse it
+        if (self._distance_matrix_version == self.nodes.version
+                and len(self.nodes) <= self._PRESET_MATRIX_MAX_NODES):
+            # Encoded on the worker thread, together with the coordinates it was computed from
+            data["distance_matrix"] = (self.compact_distance_matrix(), self.nodes.coordinates_signature())
+        
+        # Serialize and write the file off the UI thread
+        self.status_label.configure(text=f"Saving preset to {os.path.basename(file_path)}...")
+        save_thread = threading.Thread(target=self.write_preset_file, args=(file_path, data))
+        save_thread.daemon = True
+        save_thread.start()
+    
+    def write_preset_file(self, file_path, data):
+        """Write a preset to disk in a background thread"""
         try:
-            # Prepare data to save
-            data = {
-                "nodes": [node.to_dict() for node in self.nodes],
-                "num_vehicles": self.num_vehicles,
-                "available_skills": self.available_skills,
-                "vehicle_skills": self.vehicle_skills
-            }
+            if "distance_matrix" in data:
+                data["distance_matrix"] = self.encode_matrix(*data["distance_matrix"])
             
-            # Save to file
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
-                
-            self.status_label.configure(text=f"Saved preset to {os.path.basename(file_path)}")
+            # Save to file (int vehicle ids are written as string keys, like the json module did,
+            # and any NumPy values in the snapshot are serialized natively)
+            options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(data, option=options))
+            self.post_message(("preset_saved", file_path))
             
         except Exception as e:
-            messagebox.showerror("Save Error", f"Error saving preset: {str(e)}")
+            self.post_message(("preset_error", "Save Error", f"Error saving preset: {str(e)}"))
     
     def on_load_preset(self):
         """Handle load preset button click"""
@@ -774,34 +1281,110 @@ class VRPApp(ctk.CTk):
         if not file_path:
             return  # User cancelled
             
+        # Read and parse the file off the UI thread
+        self.status_label.configure(text=f"Loading preset from {os.path.basename(file_path)}...")
+        load_thread = threading.Thread(target=self.read_preset_file, args=(file_path,))
+        load_thread.daemon = True
+        load_thread.start()
+    
+    def read_preset_file(self, file_path):
+        """Read a preset from disk in a background thread"""
         try:
             # Load from file
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                
-            # Clear current state
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
+            # Build the node arrays here as well; the UI thread only swaps them in
+            data["node_store"] = NodeStore.from_dicts(data["nodes"])
+            
+            # Only keep a saved distance matrix that was computed for exactly these coordinates
+            entry = data.get("distance_matrix")
+            matrix = self.decode_matrix(entry)
+            if matrix is not None and entry.get("signature") != data["node_store"].coordinates_signature():
+                matrix = None
+            data["distance_matrix"] = matrix
+            self.post_message(("preset_loaded", file_path, data))
+            
+        except Exception as e:
+            self.post_message(("preset_error", "Load Error", f"Error loading preset: {str(e)}"))
+    
+    @staticmethod
+    def encode_matrix(matrix, signature):
+        """Encode a distance matrix for a preset as base64 raw bytes plus shape, dtype and coordinates signature"""
+        return {
+            "shape": list(matrix.shape),
+            "dtype": matrix.dtype.name,
+            "signature": signature,
+            "data": base64.b64encode(matrix.tobytes()).decode("ascii")
+        }
+    
+    @staticmethod
+    def decode_matrix(entry):
+        """Decode a distance matrix written by encode_matrix, or return None if it is missing or invalid"""
+        try:
+            matrix = np.frombuffer(base64.b64decode(entry["data"]), dtype=np.dtype(entry["dtype"]))
+            return matrix.reshape(entry["shape"])
+        except (TypeError, KeyError, ValueError):
+            return None  # Older presets have no matrix; it is simply recomputed
+    
+    def apply_preset(self, file_path, data):
+        """Replace the current scenario with a loaded preset (runs on the UI thread)"""
+        try:
+            # Validate the settings and assign fresh skill bits before touching the current scenario
+            num_vehicles = int(data["num_vehicles"])
+            available_skills = [sys.intern(skill) for skill in data["available_skills"]]
+            vehicle_skills = {
+                int(k): [sys.intern(skill) for skill in v] for k, v in data["vehicle_skills"].items()
+            }
+            node_skills = [node_data["required_skills"] for node_data in data["nodes"]]
+            skill_bits = VRPNode.build_skill_bits(
+                itertools.chain(available_skills, *vehicle_skills.values(), *node_skills)
+            )
+            skill_masks = []
+            for skills in node_skills:
+                skill_mask = 0
+                for skill in skills:
+                    skill_mask |= skill_bits[skill]  # OR, so repeated skills are only counted once
+                skill_masks.append(skill_mask)
+        except Exception as e:
+            messagebox.showerror("Load Error", f"Error loading preset: {str(e)}")
+            return
+        
+        try:
+            # Clear current state, including the skill bits of the previous scenario
             self.selected_node = None
-            self.nodes = []
-            self.routes = []
+            self.nodes = data["node_store"]
+            self.set_routes([])
+            VRPNode.reset_skill_bits(skill_bits)
             
-            # Load nodes
-            VRPNode.id_counter = 0  # Reset node ID counter
-            for node_data in data["nodes"]:
-                node = VRPNode.from_dict(node_data)
-                self.nodes.append(node)
-                if not node.is_depot:
-                    VRPNode.id_counter = max(VRPNode.id_counter, node.id + 1)
+            # Apply required skills (skill bits are only assigned on the UI thread)
+            for node, skill_mask in zip(self.nodes, skill_masks):
+                if skill_mask:
+                    node.set_skill_mask(skill_mask)
+            
+            # Continue node IDs after the highest loaded customer ID
+            n = len(self.nodes)
+            customer_ids = self.nodes.ids[:n][~self.nodes.is_depot[:n]]
+            VRPNode.id_counter = max(1, int(customer_ids.max()) + 1) if customer_ids.size else 1
             
             # Find depot node
             self.depot_node = next((node for node in self.nodes if node.is_depot), None)
             
+            # Seed the distance matrix cache with the saved matrix so it isn't recomputed
+            matrix = data.get("distance_matrix")
+            if matrix is not None and matrix.shape == (len(self.nodes), len(self.nodes)):
+                xs, ys = self.nodes.positions()
+                self._distance_matrix = matrix
+                self._distance_matrix_version = self.nodes.version
+                self._distance_xs = xs.copy()
+                self._distance_ys = ys.copy()
+            
             # Load other settings
-            self.num_vehicles = data["num_vehicles"]
+            self.num_vehicles = num_vehicles
             self.vehicle_count_var.set(self.num_vehicles)
             self.vehicle_count_label.configure(text=str(self.num_vehicles))
             
-            self.available_skills = data["available_skills"]
-            self.vehicle_skills = {int(k): v for k, v in data["vehicle_skills"].items()}
+            self.available_skills = available_skills
+            self.vehicle_skills = vehicle_skills
             
             # Update UI
             self.draw_nodes()
@@ -818,53 +1401,76 @@ class VRPApp(ctk.CTk):
         if len(self.nodes) < 2:
             messagebox.showinfo("Not Enough Nodes", "Please add at least one customer node.")
             return
+        
+        # Import the VRP solver functionality from main.py on first use
+        try:
+            self.load_solver_module()
+        except ImportError as e:
+            messagebox.showerror("Solver Error", f"Could not load the VRP solver: {str(e)}")
+            return
             
+        # Snapshot the scenario here so the solver thread never touches app state
+        try:
+            data = self.prepare_solver_data()
+        except ValueError as e:
+            messagebox.showerror("Solver Error", str(e))
+            return
+        
         # Update status
         self.status_label.configure(text="Solving VRP...")
         
         # Run solver in a separate thread to keep UI responsive
-        solver_thread = threading.Thread(target=self.run_vrp_solver)
+        solver_thread = threading.Thread(target=self.run_vrp_solver, args=(data,))
         solver_thread.daemon = True
         solver_thread.start()
-        
-        # Check for results periodically
-        self.after(100, self.check_solver_results)
     
-    def run_vrp_solver(self):
-        """Run the VRP solver in a background thread"""
+    def load_solver_module(self):
+        """Import the OR-Tools based solver module (main.py) once and return it"""
+        if self._solver_mod is None:
+            import main as solver_module
+            self._solver_mod = solver_module
+        return self._solver_mod
+    
+    def run_vrp_solver(self, data):
+        """Run the VRP solver in a background thread on a snapshot from prepare_solver_data"""
+        pywrapcp = self._solver_mod.pywrapcp
+        routing_enums_pb2 = self._solver_mod.routing_enums_pb2
+        nodes = data["nodes"]
         try:
             # Debug message for node count
-            node_count = len(self.nodes)
-            customer_count = sum(1 for node in self.nodes if not node.is_depot)
-            debug_msg = f"Solving VRP with {node_count} total nodes ({customer_count} customers) and {self.num_vehicles} vehicles"
+            node_count = len(nodes)
+            customer_count = sum(1 for node in nodes if not node["is_depot"])
+            debug_msg = f"Solving VRP with {node_count} total nodes ({customer_count} customers) and {data['num_vehicles']} vehicles"
             print(debug_msg)
-            self.queue.put(("debug", debug_msg))
+            self.post_message(("debug", debug_msg))
             
-            # Prepare data for the solver
-            data = self.prepare_solver_data()
-            
-            # Debug distance matrix
-            print("Distance Matrix:")
-            for i, row in enumerate(data["distance_matrix"]):
-                node_type = "Depot" if i == 0 else "Customer"
-                print(f"Node {i} ({node_type}): {row}")
+            # Debug distance matrix (only a checksum for large matrices)
+            if self.debug:
+                distance_matrix = data["distance_matrix"]
+                if len(distance_matrix) > 100:
+                    checksum = hashlib.blake2b(distance_matrix.tobytes()).hexdigest()[:8]
+                    print(f"Distance Matrix: shape {distance_matrix.shape}, checksum {checksum}")
+                else:
+                    print("Distance Matrix:")
+                    for i, row in enumerate(distance_matrix):
+                        node_type = "Depot" if i == 0 else "Customer"
+                        print(f"Node {i} ({node_type}): {row.tolist()}")
             
             # Create the routing index manager
             manager = pywrapcp.RoutingIndexManager(
                 len(data["distance_matrix"]), data["num_vehicles"], data["depot"]
             )
 
-            # Create Routing Model
-            routing = pywrapcp.RoutingModel(manager)
-
-            # Register distance callback
-            def distance_callback(from_index, to_index):
-                """Returns the distance between the two nodes."""
-                from_node = manager.IndexToNode(from_index)
-                to_node = manager.IndexToNode(to_index)
-                return data["distance_matrix"][from_node][to_node]
+            # Create Routing Model (all vehicles share one cost model, so let OR-Tools collapse them)
+            model_parameters = pywrapcp.DefaultRoutingModelParameters()
+            model_parameters.max_callback_cache_size = len(data["distance_matrix"]) ** 2
+            model_parameters.reduce_vehicle_cost_model = True
+            routing = pywrapcp.RoutingModel(manager, model_parameters)
 
-            transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+            # Register the distance matrix directly so arc costs never call back into Python
+            # (the SWIG wrapper only accepts nested sequences, not arrays)
+            distance_rows = data["distance_matrix"].tolist()
+            transit_callback_index = routing.RegisterTransitMatrix(distance_rows)
             routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
 
             # Add Distance constraint
@@ -880,8 +1486,10 @@ class VRPApp(ctk.CTk):
             distance_dimension.SetGlobalSpanCostCoefficient(100)
 
             # Check for nodes with skills/time windows
-            has_time_windows = any(node.time_window for node in self.nodes)
-            has_skills = any(node.required_skills for node in self.nodes)
+            time_window_rows = data["time_window_rows"]
+            skill_rows = data["skill_rows"]
+            has_time_windows = bool(time_window_rows)
+            has_skills = bool(skill_rows)
             print(f"Has time windows: {has_time_windows}, Has skills: {has_skills}")
 
             # Only add time window constraints if at least one node has time windows
@@ -898,40 +1506,33 @@ class VRPApp(ctk.CTk):
                 time_dimension = routing.GetDimensionOrDie(time_dimension_name)
                 
                 # Add time window constraints
-                for node_idx, node in enumerate(self.nodes):
-                    if node.time_window:
-                        index = manager.NodeToIndex(node_idx)
-                        time_dimension.CumulVar(index).SetRange(
-                            node.time_window[0], node.time_window[1]
-                        )
+                for node_idx in time_window_rows:
+                    node = nodes[node_idx]
+                    index = manager.NodeToIndex(node_idx)
+                    time_dimension.CumulVar(index).SetRange(
+                        node["time_window"][0], node["time_window"][1]
+                    )
             
             # Only add skills constraints if at least one node has required skills
             if has_skills:
-                # First check if any node has skills that no vehicle possesses
-                for node in self.nodes:
-                    if not node.required_skills:
-                        continue
+                node_masks = data["node_skill_masks"]
+                vehicle_masks = data["vehicle_skill_masks"]
+                
+                # Set allowed vehicles for each node based on skills
+                for node_idx in skill_rows:
+                    node = nodes[node_idx]
                     
-                    valid_vehicles = []
-                    for v_id in range(data["num_vehicles"]):
-                        if all(skill in self.vehicle_skills.get(v_id, []) for skill in node.required_skills):
-                            valid_vehicles.append(v_id)
+                    # Find vehicles with all required skills
+                    required = node_masks[node_idx]
+                    valid_vehicles = [v_id for v_id, mask in enumerate(vehicle_masks) if required & mask == required]
                     
+                    # Fail early if no vehicle possesses the node's skills
                     if not valid_vehicles:
-                        self.queue.put(("error", f"No vehicle has the skills required for node {node.id} ({', '.join(node.required_skills)})"))
+                        self.post_message(("error", f"No vehicle has the skills required for node {node['id']} ({', '.join(node['required_skills'])})"))
                         return
-                
-                # Set allowed vehicles for each node based on skills
-                for node_idx, node in enumerate(self.nodes):
-                    if not node.required_skills or node.is_depot:
+                    if node["is_depot"]:
                         continue
                     
-                    # Find vehicles with all required skills
-                    valid_vehicles = []
-                    for v_id in range(data["num_vehicles"]):
-                        if all(skill in self.vehicle_skills.get(v_id, []) for skill in node.required_skills):
-                            valid_vehicles.append(v_id)
-                    
                     # Create allowed vehicles list for this node
                     index = manager.NodeToIndex(node_idx)
                     routing.VehicleVar(index).SetValues(valid_vehicles)
@@ -944,8 +1545,13 @@ class VRPApp(ctk.CTk):
                 routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
             )
             
+            # Parallel cheapest insertion copes much better with time windows and skill restrictions
+            if has_time_windows or has_skills:
+                search_parameters.first_solution_strategy = (
+                    routing_enums_pb2.FirstSolutionStrategy.PARALLEL_CHEAPEST_INSERTION
+                )
             # Try a different solver strategy if we have many nodes
-            if len(self.nodes) > 20:
+            elif node_count > 20:
                 search_parameters.first_solution_strategy = (
                     routing_enums_pb2.FirstSolutionStrategy.SAVINGS
                 )
@@ -954,7 +1560,7 @@ class VRPApp(ctk.CTk):
             search_parameters.time_limit.seconds = 10
             
             # Only use metaheuristics for complex problems with constraints
-            if has_time_windows or has_skills or len(self.nodes) > 15:
+            if has_time_windows or has_skills or node_count > 15:
                 search_parameters.local_search_metaheuristic = (
                     routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
                 )
@@ -969,48 +1575,23 @@ class VRPApp(ctk.CTk):
             print(f"Solver completed, solution found: {solution is not None}")
 
             if solution:
-                # Extract routes
-                routes = []
-                max_route_distance = 0
-                for vehicle_id in range(data["num_vehicles"]):
-                    route = []
-                    index = routing.Start(vehicle_id)
-                    route_distance = 0
-                    
-                    while not routing.IsEnd(index):
-                        node_idx = manager.IndexToNode(index)
-                        route.append(self.nodes[node_idx].id)
-                        
-                        previous_index = index
-                        index = solution.Value(routing.NextVar(index))
-                        route_distance += routing.GetArcCostForVehicle(previous_index, index, vehicle_id)
-                    
-                    # Add the depot at the end
-                    node_idx = manager.IndexToNode(index)
-                    route.append(self.nodes[node_idx].id)
-                    
-                    # Print route for debugging
-                    print(f"Vehicle {vehicle_id} route: {route}, distance: {route_distance}")
-                    
-                    routes.append(route)
-                    max_route_distance = max(route_distance, max_route_distance)
-                
-                # Put results in the queue
-                self.queue.put(("success", routes, max_route_distance))
+                # Extract routes and put results in the queue
+                routes, max_route_distance = self._extract_routes(routing, manager, solution, data, distance_rows)
+                self.post_message(("success", routes, max_route_distance))
             else:
                 # Handle the case where no solution is found
-                if len(self.nodes) <= 1:
-                    self.queue.put(("error", "Need at least one customer node to create routes."))
+                if node_count <= 1:
+                    self.post_message(("error", "Need at least one customer node to create routes."))
                 elif data["num_vehicles"] < 1:
-                    self.queue.put(("error", "Need at least one vehicle to create routes."))
+                    self.post_message(("error", "Need at least one vehicle to create routes."))
                 elif has_time_windows:
-                    self.queue.put(("error", "Could not find a solution. Try relaxing time window constraints."))
+                    self.post_message(("error", "Could not find a solution. Try relaxing time window constraints."))
                 elif has_skills:
-                    self.queue.put(("error", "Could not find a solution. Check that vehicles have the necessary skills."))
+                    self.post_message(("error", "Could not find a solution. Check that vehicles have the necessary skills."))
                 else:
                     # Try again with a different strategy as a fallback
                     print("No solution found. Trying again with different solver settings...")
-                    self.queue.put(("debug", "First attempt failed. Trying with different solver settings..."))
+                    self.post_message(("debug", "First attempt failed. Trying with different solver settings..."))
                     
                     # Create new search parameters with different strategy
                     fallback_parameters = pywrapcp.DefaultRoutingSearchParameters()
@@ -1030,103 +1611,124 @@ class VRPApp(ctk.CTk):
                     
                     if solution:
                         # Extract routes with the fallback solution
-                        routes = []
-                        max_route_distance = 0
-                        for vehicle_id in range(data["num_vehicles"]):
-                            route = []
-                            index = routing.Start(vehicle_id)
-                            route_distance = 0
-                            
-                            while not routing.IsEnd(index):
-                                node_idx = manager.IndexToNode(index)
-                                route.append(self.nodes[node_idx].id)
-                                
-                                previous_index = index
-                                index = solution.Value(routing.NextVar(index))
-                                route_distance += routing.GetArcCostForVehicle(previous_index, index, vehicle_id)
-                            
-                            # Add the depot at the end
-                            node_idx = manager.IndexToNode(index)
-                            route.append(self.nodes[node_idx].id)
-                            
-                            # Print route for debugging
-                            print(f"Fallback - Vehicle {vehicle_id} route: {route}, distance: {route_distance}")
-                            
-                            routes.append(route)
-                            max_route_distance = max(route_distance, max_route_distance)
-                        
-                        self.queue.put(("success", routes, max_route_distance))
+                        routes, max_route_distance = self._extract_routes(
+                            routing, manager, solution, data, distance_rows, log_prefix="Fallback - "
+                        )
+                        self.post_message(("success", routes, max_route_distance))
                     else:
                         # Still no solution
-                        self.queue.put(("error", "Could not find a solution. Try using more vehicles or check if constraints are feasible."))
+                        self.post_message(("error", "Could not find a solution. Try using more vehicles or check if constraints are feasible."))
         except Exception as e:
             # Handle unexpected errors
             import traceback
             print(f"Error during solving: {str(e)}")
             print(traceback.format_exc())
-            self.queue.put(("error", f"Error during solving: {str(e)}"))
+            self.post_message(("error", f"Error during solving: {str(e)}"))
+    
+    def _extract_routes(self, routing, manager, solution, data, distance_rows, log_prefix=""):
+        """Return the node id routes of a solution and the longest route distance"""
+        nodes = data["nodes"]
+        
+        # Read the successor of every index and the index -> node mapping once, then walk them locally
+        size = routing.Size()  # Indices from size on are route ends
+        next_index = [solution.Value(routing.NextVar(index)) for index in range(size)]
+        index_to_node = [manager.IndexToNode(index) for index in range(manager.GetNumberOfIndices())]
+        
+        routes = []
+        max_route_distance = 0
+        for vehicle_id in range(data["num_vehicles"]):
+            index = routing.Start(vehicle_id)
+            node_idx = index_to_node[index]
+            route = [nodes[node_idx]["id"]]
+            route_distance = 0
+            
+            # Follow the route up to and including the depot at the end (arc costs are the matrix entries)
+            while index < size:
+                index = next_index[index]
+                next_node_idx = index_to_node[index]
+                route_distance += distance_rows[node_idx][next_node_idx]
+                route.append(nodes[next_node_idx]["id"])
+                node_idx = next_node_idx
+            
+            # Print route for debugging
+            print(f"{log_prefix}Vehicle {vehicle_id} route: {route}, distance: {route_distance}")
+            
+            routes.append(route)
+            max_route_distance = max(route_distance, max_route_distance)
+        
+        return routes, max_route_distance
     
     def prepare_solver_data(self):
-        """Prepare data for the VRP solver"""
+        """Prepare data for the VRP solver (a snapshot that is safe to hand to the solver thread)"""
         data = {}
         
-        # Create distance matrix
-        num_nodes = len(self.nodes)
-        distance_matrix = [[0 for _ in range(num_nodes)] for _ in range(num_nodes)]
-        
-        for i in range(num_nodes):
-            for j in range(num_nodes):
-                if i == j:
-                    distance_matrix[i][j] = 0
-                else:
-                    # Calculate Euclidean distance between nodes
-                    node_i = self.nodes[i]
-                    node_j = self.nodes[j]
-                    dist = int(math.sqrt((node_i.x - node_j.x)**2 + (node_i.y - node_j.y)**2) * 100)
-                    distance_matrix[i][j] = dist
-        
-        data["distance_matrix"] = distance_matrix
+        # Create distance matrix (cached until the nodes change)
+        data["distance_matrix"] = self.compact_distance_matrix()
         data["num_vehicles"] = self.num_vehicles
         data["depot"] = 0  # Depot is always the first node
         
+        # Copy node constraints so later UI edits don't race with the solver
+        data["nodes"] = self.nodes.to_dicts()
+        
+        # Skill bitmasks, so vehicle compatibility is a single integer AND per vehicle
+        data["node_skill_masks"] = self.nodes.skill_masks[:len(self.nodes)].tolist()
+        data["vehicle_skill_masks"] = [
+            VRPNode.skills_to_mask(self.vehicle_skills.get(v_id, [])) for v_id in range(self.num_vehicles)
+        ]
+        
+        # Rows of the nodes that actually carry constraints, so the solver only visits those
+        n = len(self.nodes)
+        data["time_window_rows"] = np.flatnonzero(self.nodes.has_time_window[:n]).tolist()
+        data["skill_rows"] = np.flatnonzero(self.nodes.skill_masks[:n]).tolist()
+        
         return data
     
-    def check_solver_results(self):
-        """Check for solver results from the queue"""
+    def post_message(self, message):
+        """Queue a message from a worker thread for handle_queue_message"""
+        self.queue.put(message)
+    
+    def _dispatch_messages(self):
+        """Wait for worker messages and schedule each one on the UI thread (runs in its own thread)"""
+        while True:
+            message = self.queue.get()
+            self.after(0, self.handle_queue_message, message)
+    
+    def handle_queue_message(self, result):
+        """Handle a single message from a worker thread (runs on the UI thread)"""
         try:
-            if not self.queue.empty():
-                result = self.queue.get()
+            if result[0] == "success":
+                routes = result[1]
+                max_distance = result[2]
                 
-                if result[0] == "success":
-                    routes = result[1]
-                    max_distance = result[2]
-                    
-                    self.routes = routes
-                    self.draw_routes()
-                    
-                    self.status_label.configure(
-                        text=f"Solution found! Maximum route distance: {max_distance/100:.1f}"
-                    )
-                    
-                elif result[0] == "debug":
-                    debug_msg = result[1]
-                    # Update status but continue checking for more results
-                    self.status_label.configure(text=f"Debug: {debug_msg}")
-                    self.after(100, self.check_solver_results)
-                    return
-                    
-                elif result[0] == "no_solution":
-                    messagebox.showinfo("No Solution", "The solver could not find a solution.")
-                    self.status_label.configure(text="No solution found")
-                    
-                elif result[0] == "error":
-                    error_msg = result[1]
-                    messagebox.showerror("Solver Error", error_msg)
-                    self.status_label.configure(text=f"Error: {error_msg}")
-            else:
-                # Keep checking until we get a result
-                self.after(100, self.check_solver_results)
-                return
+                self.set_routes(routes)
+                
+                self.status_label.configure(
+                    text=f"Solution found! Maximum route distance: {max_distance/100:.1f}"
+                )
+                
+            elif result[0] == "debug":
+                debug_msg = result[1]
+                self.status_label.configure(text=f"Debug: {debug_msg}")
+                
+            elif result[0] == "no_solution":
+                messagebox.showinfo("No Solution", "The solver could not find a solution.")
+                self.status_label.configure(text="No solution found")
+                
+            elif result[0] == "error":
+                error_msg = result[1]
+                messagebox.showerror("Solver Error", error_msg)
+                self.status_label.configure(text=f"Error: {error_msg}")
+                
+            elif result[0] == "preset_saved":
+                self.status_label.configure(text=f"Saved preset to {os.path.basename(result[1])}")
+                
+            elif result[0] == "preset_loaded":
+                self.apply_preset(result[1], result[2])
+                
+            elif result[0] == "preset_error":
+                title, error_msg = result[1], result[2]
+                messagebox.showerror(title, error_msg)
+                self.status_label.configure(text=f"Error: {error_msg}")
                 
         except Exception as e:
             messagebox.showerror("Error", f"Error checking solver results: {str(e)}")
@@ -1134,8 +1736,7 @@ class VRPApp(ctk.CTk):
     
     def on_clear_routes(self):
         """Handle clear routes button click"""
-        self.routes = []
-        self.canvas.delete("route")
+        self.set_routes([])
         self.status_label.configure(text="Routes cleared")
     
     def on_clear_all(self):
@@ -1143,13 +1744,13 @@ class VRPApp(ctk.CTk):
         # Ask for confirmation
         if messagebox.askyesno("Confirm Clear All", "Clear all nodes and routes?"):
             # Keep only the depot node
-            self.nodes = [node for node in self.nodes if node.is_depot]
-            self.routes = []
+            for node in [node for node in self.nodes if not node.is_depot]:
+                self.nodes.remove(node)
+            self.set_routes([])
             self.selected_node = None
             
             # Redraw
             self.draw_nodes()
-            self.canvas.delete("route")
             self.status_label.configure(text="All nodes and routes cleared")
 
 